@@ -12,6 +12,15 @@ class SimulatorHelper(object):
         fashion to the system starting from start_config.
         """
         x0_n1d, _ = self.system_dynamics.parse_trajectory(start_config)
+
+        # With ideal dynamics the applied actions are the commanded ones
+        # so the whole rollout can run as a single graph function
+        if sim_mode == 'ideal':
+            trajectory = self.system_dynamics.simulate_T(x0_n1d, control_nk2[:, :T], T,
+                                                         pad_mode='repeat', mode=sim_mode)
+            commanded_actions_nkf = tf.concat([control_nk2[:, :T], control_nk2[:, T-1:T]], axis=1)
+            return trajectory, commanded_actions_nkf
+
         applied_actions = []
         states = [x0_n1d*1.]
         x_next_n1d = x0_n1d*1.
@@ -20,9 +29,7 @@ class SimulatorHelper(object):
             x_next_n1d = self.system_dynamics.simulate(x_next_n1d, u_n1f, mode=sim_mode)
 
             # Append the applied action to the action list
-            if sim_mode == 'ideal':
-                applied_actions.append(u_n1f)
-            elif sim_mode == 'realistic':
+            if sim_mode == 'realistic':
                 # TODO: This line is intended for a real hardware setup.
                 # If running this code on a real robot the user will need to
                 # implement hardware.state_dx such that it reflects the current
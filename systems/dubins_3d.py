@@ -1,4 +1,5 @@
 import tensorflow as tf
+import tensorflow.contrib.eager as tfe
 from trajectory.trajectory import Trajectory
 from systems.dubins_car import DubinsCar
 
@@ -12,55 +13,80 @@ class Dubins3D(DubinsCar):
     theta(t+1) = theta_t + saturate_angular_velocity(w(t))*delta_t
     """
 
-    def __init__(self, dt, simulation_params=None):
+    def __init__(self, dt, simulation_params=None, dtype=tf.float32):
         super(Dubins3D, self).__init__(dt, x_dim=3, u_dim=2)
         self._angle_dims = 2
+
+        # The precision in which the state update (but not the
+        # state itself) is computed in simulate
+        self.dtype = dtype
         self.simulation_params = simulation_params
         if self.simulation_params.noise_params.is_noisy:
             print('This Dubins car model has some noise. Please turn off the noise if this was not intended.')
 
     def _simulate_ideal(self, x_nk3, u_nk2, t=None):
         with tf.name_scope('simulate'):
-            delta_x_nk3 = tf.stack([self._saturate_linear_velocity(u_nk2[:, :, 0])*tf.cos(x_nk3[:, :, 2]),
-                                    self._saturate_linear_velocity(u_nk2[:, :, 0])*tf.sin(x_nk3[:, :, 2]),
-                                    self._saturate_angular_velocity(u_nk2[:, :, 1])], axis=2)
-            
+            x_tp1_nk3 = self._simulate_ideal_fused(tf.convert_to_tensor(x_nk3), tf.convert_to_tensor(u_nk2))
+
             # Add noise (or disturbance) if required
             if self.simulation_params.noise_params.is_noisy:
                 noise_component = self.compute_noise_component(required_shape=tf.shape(x_nk3), data_type=x_nk3.dtype)
-                return x_nk3 + self._dt * delta_x_nk3 + noise_component
+                return x_tp1_nk3 + noise_component
             else:
-                return x_nk3 + self._dt * delta_x_nk3
+                return x_tp1_nk3
+
+    # Compiled with XLA and traced once per input shape (inputs must be tensors)
+    @tfe.defun(compiled=True)
+    def _simulate_ideal_fused(self, x_nk3, u_nk2):
+        # The update is computed in self.dtype then accumulated
+        # in the precision of the state to avoid drift
+        theta_nk1 = tf.cast(x_nk3[:, :, 2:3], self.dtype)
+        u_nk2 = tf.cast(u_nk2, self.dtype)
+        v_nk1 = self._saturate_linear_velocity(u_nk2[:, :, 0:1])
+        w_nk1 = self._saturate_angular_velocity(u_nk2[:, :, 1:2])
+        delta_x_nk3 = tf.concat([v_nk1*tf.cos(theta_nk1),
+                                 v_nk1*tf.sin(theta_nk1),
+                                 w_nk1], axis=2)
+        return x_nk3 + self._dt * tf.cast(delta_x_nk3, x_nk3.dtype)
 
     def jac_x(self, trajectory):
         x_nk3, u_nk2 = self.parse_trajectory(trajectory)
         with tf.name_scope('jac_x'):
-            # Rightmost Column
-            update_nk3 = tf.stack([-self._saturate_linear_velocity(u_nk2[:, :, 0])*tf.sin(x_nk3[:, :, 2]),
-                                   self._saturate_linear_velocity(u_nk2[:, :, 0])*tf.cos(x_nk3[:, :, 2]),
-                                   tf.zeros(shape=x_nk3.shape[:2])], axis=2)
-            update_nk33 = tf.stack([tf.zeros_like(x_nk3),
-                                   tf.zeros_like(x_nk3),
-                                   update_nk3], axis=3)
-            return tf.eye(3, batch_shape=x_nk3.shape[:2]) + self._dt*update_nk33
+            return self._jac_x_fused(x_nk3, u_nk2)
+
+    @tfe.defun(compiled=True)
+    def _jac_x_fused(self, x_nk3, u_nk2):
+        # The jacobian is the identity except for the rightmost column
+        theta_nk1 = x_nk3[:, :, 2:3]
+        v_nk1 = self._saturate_linear_velocity(u_nk2[:, :, 0:1])
+        column2_nk3 = tf.concat([-self._dt*v_nk1*tf.sin(theta_nk1),
+                                 self._dt*v_nk1*tf.cos(theta_nk1),
+                                 tf.ones_like(theta_nk1)], axis=2)
+        identity_columns_nk32 = tf.eye(3, num_columns=2, batch_shape=x_nk3.shape[:2])
+        return tf.concat([identity_columns_nk32, column2_nk3[:, :, :, None]], axis=3)
 
     def jac_u(self, trajectory):
         x_nk3, u_nk2 = self.parse_trajectory(trajectory)
         with tf.name_scope('jac_u'):
-            vtilde_prime_nk = self._saturate_linear_velocity_prime(u_nk2[:, :, 0])
-            wtilde_prime_nk = self._saturate_angular_velocity_prime(u_nk2[:, :, 1])
-            zeros_nk = tf.zeros(shape=x_nk3.shape[:2], dtype=tf.float32)
+            return self._jac_u_fused(x_nk3, u_nk2)
+
+    @tfe.defun(compiled=True)
+    def _jac_u_fused(self, x_nk3, u_nk2):
+        theta_nk1 = x_nk3[:, :, 2:3]
+        vtilde_prime_nk1 = self._saturate_linear_velocity_prime(u_nk2[:, :, 0:1])
+        wtilde_prime_nk1 = self._saturate_angular_velocity_prime(u_nk2[:, :, 1:2])
+        zeros_nk1 = tf.zeros_like(theta_nk1)
 
-            # Columns
-            b1_nk3 = tf.stack([vtilde_prime_nk*tf.cos(x_nk3[:, :, 2]),
-                               vtilde_prime_nk*tf.sin(x_nk3[:, :, 2]),
-                               zeros_nk], axis=2)
-            b2_nk3 = tf.stack([zeros_nk,
-                               zeros_nk,
-                               wtilde_prime_nk], axis=2)
+        # Columns
+        b1_nk3 = tf.concat([vtilde_prime_nk1*tf.cos(theta_nk1),
+                            vtilde_prime_nk1*tf.sin(theta_nk1),
+                            zeros_nk1], axis=2)
+        b2_nk3 = tf.concat([zeros_nk1,
+                            zeros_nk1,
+                            wtilde_prime_nk1], axis=2)
 
-            B_nk32 = tf.stack([b1_nk3, b2_nk3], axis=3)
-            return B_nk32*self._dt
+        B_nk32 = tf.stack([b1_nk3, b2_nk3], axis=3)
+        return B_nk32*self._dt
 
     def parse_trajectory(self, trajectory):
         """ A utility function for parsing a trajectory object.
@@ -68,20 +94,24 @@ class Dubins3D(DubinsCar):
         system """
         return trajectory.position_and_heading_nk3(), trajectory.speed_and_angular_speed_nk2()
 
-    def assemble_trajectory(self, x_nkd, u_nkf, pad_mode=None):
+    def assemble_trajectory(self, x_nkd, u_nkf, pad_mode=None, skip_clip=False):
         """ A utility function for assembling a trajectory object
         from x_nkd, u_nkf, a list of states and actions for the system.
-        Here d=3=state dimension and u=2=action dimension. """
-        n = x_nkd.shape[0].value
-        k = x_nkd.shape[1].value
+        Here d=3=state dimension and u=2=action dimension. If the
+        actions are known to be within the velocity bounds skip_clip
+        can be set to skip saturating them again. """
+        n, k, _ = x_nkd.shape.as_list()
         u_nkf = self._pad_control_vector(u_nkf, k, pad_mode=pad_mode)
-        position_nk2, heading_nk1 = x_nkd[:, :, :2], x_nkd[:, :, 2:3]
-        speed_nk1, angular_speed_nk1 = u_nkf[:, :, 0:1], u_nkf[:, :, 1:2]
-        speed_nk1 = self._saturate_linear_velocity(speed_nk1)
-        angular_speed_nk1 = self._saturate_angular_velocity(angular_speed_nk1)
+        position_nk2, heading_nk1 = tf.split(x_nkd, [2, 1], axis=2)
+        speed_nk1, angular_speed_nk1 = tf.split(u_nkf, 2, axis=2)
+        if not skip_clip:
+            speed_nk1 = self._saturate_linear_velocity(speed_nk1)
+            angular_speed_nk1 = self._saturate_angular_velocity(angular_speed_nk1)
+        zeros_nk1 = tf.zeros_like(speed_nk1)
         return Trajectory(dt=self._dt, n=n, k=k, position_nk2=position_nk2,
                           heading_nk1=heading_nk1, speed_nk1=speed_nk1,
-                          angular_speed_nk1=angular_speed_nk1, variable=False)
+                          angular_speed_nk1=angular_speed_nk1, acceleration_nk1=zeros_nk1,
+                          angular_acceleration_nk1=zeros_nk1, direct_init=True)
     
     def compute_noise_component(self, required_shape, data_type):
         """
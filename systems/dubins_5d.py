@@ -1,3 +1,4 @@
+import numpy as np
 import tensorflow as tf
 from trajectory.trajectory import Trajectory
 from systems.dubins_car import DubinsCar
@@ -17,51 +18,46 @@ class Dubins5D(DubinsCar):
         super().__init__(dt, x_dim=5, u_dim=2)
         self._angle_dims = 2
 
+        # d theta(t+1)/ d w(t) = dt is the only off diagonal
+        # entry of jac_x which does not depend on the state
+        jac_x_offset_55 = np.zeros((5, 5), dtype=np.float32)
+        jac_x_offset_55[2, 4] = dt
+        self._jac_x_offset_55 = tf.constant(jac_x_offset_55)
+
     def _simulate_ideal(self, x_nkd, u_nkf, t=None):
         with tf.name_scope('simulate'):
             theta_nk1 = x_nkd[:, :, 2:3]
             v_nk1 = x_nkd[:, :, 3:4]
             w_nk1 = x_nkd[:, :, 4:5]
             x_new_nkd = tf.concat([x_nkd[:, :, :3],
-                                   self._saturate_linear_velocity(v_nk1 + self._dt*u_nkf[:, :, 0:1]),
-                                   self._saturate_angular_velocity(w_nk1 + self._dt*u_nkf[:, :, 1:2])],
+                                   self._saturate_linear_velocity(v_nk1 + self._dt_tensor*u_nkf[:, :, 0:1]),
+                                   self._saturate_angular_velocity(w_nk1 + self._dt_tensor*u_nkf[:, :, 1:2])],
                                   axis=2)
             delta_x_nkd = tf.concat([v_nk1*tf.cos(theta_nk1),
                                      v_nk1*tf.sin(theta_nk1),
                                      w_nk1,
                                      tf.zeros_like(u_nkf)], axis=2)
-            return x_new_nkd + self._dt*delta_x_nkd
+            return x_new_nkd + self._dt_tensor*delta_x_nkd
 
     def jac_x(self, trajectory):
         x_nk5, u_nk2 = self.parse_trajectory(trajectory)
         with tf.name_scope('jac_x'):
-            # Rightmost Column
             theta_nk1 = x_nk5[:, :, 2:3]
             v_nk1 = x_nk5[:, :, 3:4]
             w_nk1 = x_nk5[:, :, 4:5]
 
             diag_nk5 = tf.concat([tf.ones_like(x_nk5[:, :, :3]),
-                                  self._saturate_linear_velocity_prime(u_nk2[:, :, 0:1]*self._dt+v_nk1),
-                                  self._saturate_angular_velocity_prime(u_nk2[:, :, 1:2]*self._dt+w_nk1)], axis=2)
-
-            column2_nk5 = tf.concat([-v_nk1*tf.sin(theta_nk1),
-                                     v_nk1*tf.cos(theta_nk1),
-                                     tf.zeros_like(x_nk5[:, :, :3])], axis=2)
-            column3_nk5 = tf.concat([tf.cos(theta_nk1),
-                                     tf.sin(theta_nk1),
-                                     tf.zeros_like(x_nk5[:, :, :3])],
-                                    axis=2)
-            column4_nk5 = tf.concat([tf.zeros_like(x_nk5[:, :, :2]),
-                                     tf.ones_like(v_nk1),
-                                     tf.zeros_like(u_nk2)], axis=2)
+                                  self._saturate_linear_velocity_prime(u_nk2[:, :, 0:1]*self._dt_tensor+v_nk1),
+                                  self._saturate_angular_velocity_prime(u_nk2[:, :, 1:2]*self._dt_tensor+w_nk1)], axis=2)
 
-            update_nk55 = tf.stack([tf.zeros_like(x_nk5),
-                                    tf.zeros_like(x_nk5),
-                                    column2_nk5,
-                                    column3_nk5,
-                                    column4_nk5], axis=3)
+            # The remaining state dependent entries are the derivatives
+            # of x and y with respect to theta and v (rows 0-1, columns 2-3)
+            cos_theta_nk1, sin_theta_nk1 = tf.cos(theta_nk1), tf.sin(theta_nk1)
+            update_nk22 = tf.stack([tf.concat([-v_nk1*sin_theta_nk1, cos_theta_nk1], axis=2),
+                                    tf.concat([v_nk1*cos_theta_nk1, sin_theta_nk1], axis=2)], axis=2)
+            update_nk55 = tf.pad(self._dt_tensor*update_nk22, [[0, 0], [0, 0], [0, 3], [2, 1]])
 
-            return tf.linalg.diag(diag_nk5) + self._dt*update_nk55
+            return tf.linalg.diag(diag_nk5) + update_nk55 + self._jac_x_offset_55
 
     def jac_u(self, trajectory):
         x_nk5, u_nk2 = self.parse_trajectory(trajectory)
@@ -69,15 +65,12 @@ class Dubins5D(DubinsCar):
             v_nk1 = x_nk5[:, :, 3:4]
             w_nk1 = x_nk5[:, :, 4:5]
 
-            column0_nk5 = tf.concat([tf.zeros_like(x_nk5[:, :, :3]),
-                                     self._saturate_linear_velocity_prime(u_nk2[:, :, 0:1]*self._dt+v_nk1),
-                                     tf.zeros_like(v_nk1)], axis=2)
-
-            column1_nk5 = tf.concat([tf.zeros_like(x_nk5[:, :, :4]),
-                                     self._saturate_angular_velocity_prime(u_nk2[:, :, 1:2]*self._dt+w_nk1)],
-                                    axis=2)
-            B_nk52 = tf.stack([column0_nk5, column1_nk5], axis=3)
-            return B_nk52*self._dt
+            # The actions only affect v and w (rows 3-4)
+            diag_nk2 = tf.concat([self._saturate_linear_velocity_prime(u_nk2[:, :, 0:1]*self._dt_tensor+v_nk1),
+                                  self._saturate_angular_velocity_prime(u_nk2[:, :, 1:2]*self._dt_tensor+w_nk1)],
+                                 axis=2)
+            B_nk22 = tf.linalg.diag(self._dt_tensor*diag_nk2)
+            return tf.pad(B_nk22, [[0, 0], [0, 0], [3, 0], [0, 0]])
 
     def parse_trajectory(self, trajectory):
         """ A utility function for parsing a trajectory object.
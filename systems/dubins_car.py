@@ -2,6 +2,7 @@ from systems.dynamics import Dynamics
 from trajectory.trajectory import Trajectory, SystemConfig
 from utils.angle_utils import angle_normalize, rotate_pos_nk2, padded_rotation_matrix
 import tensorflow as tf
+import tensorflow.contrib.eager as tfe
 
 
 class DubinsCar(Dynamics):
@@ -157,17 +158,36 @@ class DubinsCar(Dynamics):
     def convert_position_and_heading_to_ego_coordinates(ref_position_and_heading_n13,
                                                         world_position_and_heading_nk3):
         """ Converts a sequence of position and headings to the ego frame."""
-        position_nk2 = world_position_and_heading_nk3[:, :, :2] - ref_position_and_heading_n13[:, :, :2]
-        position_nk2 = rotate_pos_nk2(position_nk2, -ref_position_and_heading_n13[:, :, 2:3])
-        heading_nk1 = angle_normalize(world_position_and_heading_nk3[:, :, 2:3] -
-                                      ref_position_and_heading_n13[:, :, 2:3])
+        ref_position_n12 = ref_position_and_heading_n13[:, :, :2]
+        ref_heading_n11 = ref_position_and_heading_n13[:, :, 2:3]
+        position_nk2 = DubinsCar._to_ego_position_nk2(tf.convert_to_tensor(world_position_and_heading_nk3[:, :, :2]),
+                                                      tf.convert_to_tensor(ref_position_n12),
+                                                      tf.convert_to_tensor(ref_heading_n11))
+        heading_nk1 = angle_normalize(world_position_and_heading_nk3[:, :, 2:3] - ref_heading_n11)
         return tf.concat([position_nk2, heading_nk1], axis=2)
 
     @staticmethod
     def convert_position_and_heading_to_world_coordinates(ref_position_and_heading_n13,
                                                           ego_position_and_heading_nk3):
         """ Converts a sequence of position and headings to the world frame."""
-        position_nk2 = rotate_pos_nk2(ego_position_and_heading_nk3[:, :, :2], ref_position_and_heading_n13[:, :, 2:3])
-        position_nk2 = position_nk2 + ref_position_and_heading_n13[:, :, :2]
-        heading_nk1 = angle_normalize(ego_position_and_heading_nk3[:, :, 2:3] + ref_position_and_heading_n13[:, :, 2:3])
+        ref_position_n12 = ref_position_and_heading_n13[:, :, :2]
+        ref_heading_n11 = ref_position_and_heading_n13[:, :, 2:3]
+        position_nk2 = DubinsCar._to_world_position_nk2(tf.convert_to_tensor(ego_position_and_heading_nk3[:, :, :2]),
+                                                        tf.convert_to_tensor(ref_position_n12),
+                                                        tf.convert_to_tensor(ref_heading_n11))
+        heading_nk1 = angle_normalize(ego_position_and_heading_nk3[:, :, 2:3] + ref_heading_n11)
         return tf.concat([position_nk2, heading_nk1], axis=2)
+
+    # Heading normalization stays outside the compiled functions as mod is
+    # not placed on the gpu (see to_egocentric_coordinates)
+    @staticmethod
+    @tfe.defun(compiled=True)
+    def _to_ego_position_nk2(world_position_nk2, ref_position_n12, ref_heading_n11):
+        """ Translates then rotates world_position_nk2 into the ego frame."""
+        return rotate_pos_nk2(world_position_nk2 - ref_position_n12, -ref_heading_n11)
+
+    @staticmethod
+    @tfe.defun(compiled=True)
+    def _to_world_position_nk2(ego_position_nk2, ref_position_n12, ref_heading_n11):
+        """ Rotates then translates ego_position_nk2 into the world frame."""
+        return rotate_pos_nk2(ego_position_nk2, ref_heading_n11) + ref_position_n12
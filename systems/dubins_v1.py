@@ -8,8 +8,8 @@ class DubinsV1(Dubins3D):
     """
     name = 'dubins_v1'
     
-    def __init__(self, dt, params):
-        super().__init__(dt, params.noise_params)
+    def __init__(self, dt, params, dtype=tf.float32):
+        super().__init__(dt, params.noise_params, dtype=dtype)
 
     def _saturate_linear_velocity(self, vtilde_nk):
         """ Identity saturation function for linear velocity"""
@@ -8,8 +8,8 @@ class DubinsV2(Dubins3D):
     """
     name = 'dubins_v2'
 
-    def __init__(self, dt, params):
-        super(DubinsV2, self).__init__(dt, params.simulation_params)
+    def __init__(self, dt, params, dtype=tf.float32):
+        super(DubinsV2, self).__init__(dt, params.simulation_params, dtype=dtype)
         self.v_bounds = params.v_bounds
         self.w_bounds = params.w_bounds
 
@@ -25,16 +25,12 @@ class DubinsV2(Dubins3D):
     
     def _saturate_linear_velocity_prime(self, vtilde_nk):
         """ Time derivative of linear clipping saturation function"""
-        less_than_idx = (vtilde_nk < self.v_bounds[0])
-        greater_than_idx = (vtilde_nk > self.v_bounds[1])
-        zero_idxs = tf.logical_or(less_than_idx, greater_than_idx)
-        res = tf.cast(tf.logical_not(zero_idxs), vtilde_nk.dtype)
+        within_bounds_idxs = tf.logical_and(vtilde_nk >= self.v_bounds[0], vtilde_nk <= self.v_bounds[1])
+        res = tf.cast(within_bounds_idxs, vtilde_nk.dtype)
         return res
 
     def _saturate_angular_velocity_prime(self, wtilde_nk):
         """ Time derivative of linear clipping saturation function"""
-        less_than_idx = (wtilde_nk < self.w_bounds[0])
-        greater_than_idx = (wtilde_nk > self.w_bounds[1])
-        zero_idxs = tf.logical_or(less_than_idx, greater_than_idx)
-        res = tf.cast(tf.logical_not(zero_idxs), wtilde_nk.dtype)
+        within_bounds_idxs = tf.logical_and(wtilde_nk >= self.w_bounds[0], wtilde_nk <= self.w_bounds[1])
+        res = tf.cast(within_bounds_idxs, wtilde_nk.dtype)
         return res
@@ -25,16 +25,12 @@ class DubinsV3(Dubins5D):
     
     def _saturate_linear_velocity_prime(self, vtilde_nk):
         """ Time derivative of linear clipping saturation function"""
-        less_than_idx = (vtilde_nk < self.v_bounds[0])
-        greater_than_idx = (vtilde_nk > self.v_bounds[1])
-        zero_idxs = tf.logical_or(less_than_idx, greater_than_idx)
-        res = tf.cast(tf.logical_not(zero_idxs), vtilde_nk.dtype)
+        within_bounds_idxs = tf.logical_and(vtilde_nk >= self.v_bounds[0], vtilde_nk <= self.v_bounds[1])
+        res = tf.cast(within_bounds_idxs, vtilde_nk.dtype)
         return res
 
     def _saturate_angular_velocity_prime(self, wtilde_nk):
         """ Time derivative of linear clipping saturation function"""
-        less_than_idx = (wtilde_nk < self.w_bounds[0])
-        greater_than_idx = (wtilde_nk > self.w_bounds[1])
-        zero_idxs = tf.logical_or(less_than_idx, greater_than_idx)
-        res = tf.cast(tf.logical_not(zero_idxs), wtilde_nk.dtype)
+        within_bounds_idxs = tf.logical_and(wtilde_nk >= self.w_bounds[0], wtilde_nk <= self.w_bounds[1])
+        res = tf.cast(within_bounds_idxs, wtilde_nk.dtype)
         return res
@@ -1,10 +1,14 @@
 import tensorflow as tf
+import tensorflow.contrib.eager as tfe
 
 
 class Dynamics(object):
 
     def __init__(self, dt, x_dim, u_dim, ctrlBounds=None):
         self._dt = dt
+        # Trajectories keep dt as a python float. Eager computations use
+        # this tensor instead so dt is not converted on every call.
+        self._dt_tensor = tf.constant(dt, dtype=tf.float32)
         self._x_dim = x_dim
         self._u_dim = u_dim
         self.ctrlBounds = ctrlBounds
@@ -59,14 +63,34 @@ class Dynamics(object):
         Apply T actions from state x_n1d
         return the resulting trajectory object.
         """
-        states = [x_n1d*1.]
-        for t in range(T):
-            x_n1d = self.simulate(x_n1d, u_nkf[:, t:t+1], mode=mode)
-            states.append(x_n1d)
-        trajectory = self.assemble_trajectory(tf.concat(states, axis=1), u_nkf,
+        if mode == 'ideal':
+            x_nkd = self._simulate_ideal_T(tf.convert_to_tensor(x_n1d),
+                                           tf.convert_to_tensor(u_nkf[:, :T]))
+        else:
+            states = [x_n1d*1.]
+            for t in range(T):
+                x_n1d = self.simulate(x_n1d, u_nkf[:, t:t+1], mode=mode)
+                states.append(x_n1d)
+            x_nkd = tf.concat(states, axis=1)
+        trajectory = self.assemble_trajectory(x_nkd, u_nkf,
                                               pad_mode=pad_mode)
         return trajectory
 
+    # Runs the rollout as one graph function; tf.scan keeps the graph size
+    # independent of T. Inputs must be tensors as defun keys numpy arrays on
+    # their values. The cache keys on self, keeping each instance alive.
+    @tfe.defun
+    def _simulate_ideal_T(self, x_n1d, u_nTf):
+        """
+        Apply the actions in u_nTf from state x_n1d using ideal system dynamics.
+        Returns the states visited, including x_n1d.
+        """
+        u_Tn1f = tf.transpose(u_nTf, perm=[1, 0, 2])[:, :, None]
+        x_Tn1d = tf.scan(lambda x_tm1_n1d, u_n1f: self._simulate_ideal(x_tm1_n1d, u_n1f),
+                         u_Tn1f, initializer=x_n1d)
+        x_nTd = tf.transpose(x_Tn1d[:, :, 0], perm=[1, 0, 2])
+        return tf.concat([x_n1d, x_nTd], axis=1)
+
     def affine_factors(self, trajectory_hat):
         A = self.jac_x(trajectory_hat)
         B = self.jac_u(trajectory_hat)
@@ -98,18 +122,15 @@ class Dynamics(object):
     def _pad_control_vector(self, u_nkf, k, pad_mode=None):
         """Pads the control vector if needed by either
         zero padding or repeating the last control sequence."""
-        n = u_nkf.shape[0].value
         if pad_mode == 'zero':  # the last action is 0
             if u_nkf.shape[1]+1 == k:
-                u_nkf = tf.concat([u_nkf, tf.zeros((n, 1, self._u_dim))],
-                                  axis=1)
+                u_nkf = tf.pad(u_nkf, [[0, 0], [0, 1], [0, 0]])
             else:
                 assert(u_nkf.shape[1] == k)
         # the last action is the same as the second to last action
         elif pad_mode == 'repeat':
             if u_nkf.shape[1]+1 == k:
-                u_end_n12 = tf.zeros((n, 1, self._u_dim)) + u_nkf[:, -1:]
-                u_nkf = tf.concat([u_nkf, u_end_n12], axis=1)
+                u_nkf = tf.concat([u_nkf, u_nkf[:, -1:]], axis=1)
             else:
                 assert(u_nkf.shape[1] == k)
         else:
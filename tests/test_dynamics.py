@@ -126,7 +126,21 @@ def test_dubins_v2(visualize=False):
     assert(np.allclose(x3, [.06+.06*np.cos(.1), .06*np.sin(.1), .2]))
     assert(np.allclose(x4, [.17850246, .01791017, .3], atol=1e-4))
 
+    # Computing the state update in half precision stays close to the full precision rollout
+    db_half = DubinsV2(dt, create_system_dynamics_params(), dtype=tf.float16)
+    trajectory_half = db_half.simulate_T(state_n13, ctrl_nk2, T=k)
+    assert(trajectory_half.position_and_heading_nk3().dtype == tf.float32)
+    assert(np.allclose(trajectory_half.position_and_heading_nk3(), state_nk3, atol=1e-2))
+
+    # Skipping the clip leaves actions that are already within bounds unchanged
+    ctrl_in_bounds_nk2 = ctrl_nk2*.5
+    trajectory = db.assemble_trajectory(state_nk3[:, :-1], ctrl_in_bounds_nk2, skip_clip=True)
+    trajectory_clipped = db.assemble_trajectory(state_nk3[:, :-1], ctrl_in_bounds_nk2)
+    assert(np.allclose(trajectory.speed_nk1(), trajectory_clipped.speed_nk1()))
+    assert(np.allclose(trajectory.angular_speed_nk1(), trajectory_clipped.angular_speed_nk1()))
+
     trajectory = db.assemble_trajectory(state_nk3[:, :-1], ctrl_nk2)
+    assert(np.allclose(trajectory.speed_nk1(), .6))
     A, B, c = db.affine_factors(trajectory)
     A0, A1, A2 = A[0, 0], A[0, 1], A[0, 2]
     A0_c = np.array([[1., 0., 0.], [0., 1., .06], [0., 0., 1.]])
@@ -131,6 +131,28 @@ def test_spline_rescaling():
     assert valid_idxs_n.numpy()[0] == 0
     
 
+def test_spline_angular_speed_at_cusp():
+    n = 1
+    dt = .1
+    k = 5
+
+    # With these factors x'(p) = 3(2p-1)^2 and y'(p) = 0 so the spline
+    # is stationary at p = .5, which is reached at t = .5
+    goal_pos_n12 = tf.constant([[[1., 0.]]])
+    start_config = SystemConfig(dt, n, 1, variable=False)
+    goal_config = SystemConfig(dt, n, 1, position_nk2=goal_pos_n12, variable=True)
+
+    p = DotMap(spline_params=DotMap(epsilon=1e-5))
+    spline_traj = Spline3rdOrder(dt=dt, k=k, n=n, params=p.spline_params)
+    spline_traj.fit(start_config, goal_config, factors=tf.constant([[3., 3.]]))
+    spline_traj.eval_spline(tf.linspace(0., 1., k)[None], calculate_speeds=True)
+
+    # The angular speed is 0 rather than NaN where the speed vanishes
+    angular_speed_k = spline_traj.angular_speed_nk1().numpy()[0, :, 0]
+    assert np.allclose(angular_speed_k, np.zeros(k))
+
+
 if __name__ == '__main__':
     test_spline_3rd_order(visualize=False)
     test_spline_rescaling()
+    test_spline_angular_speed_at_cusp()
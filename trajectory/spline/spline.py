@@ -9,12 +9,23 @@ class Spline(Trajectory):
         and goal_config (SystemConfig objects). The spline is fitted from time 0 to final time."""
         raise NotImplementedError
 
+    @property
+    def final_times_n1(self):
+        return self._final_times_n1
+
+    @final_times_n1.setter
+    def final_times_n1(self, final_times_n1):
+        """ Sets the final times, caching their reciprocal so that
+        normalizing time in eval_spline is a multiply."""
+        self._final_times_n1 = final_times_n1
+        self._inv_final_times_n1 = 1./final_times_n1
+
     def eval_spline(self, ts_nk, calculate_speeds=True):
         """ Evaluates the spline on points in ts_nk
         where ts_nk is in unnormalized time"""
         self.ts_nk = ts_nk
         # Compute the normalized time for spline evaluation
-        ts_normalized_nk = tf.clip_by_value(ts_nk/self.final_times_n1, 0., 1.)
+        ts_normalized_nk = tf.clip_by_value(ts_nk*self._inv_final_times_n1, 0., 1.)
         self._eval_spline(ts_normalized_nk, calculate_speeds)
 
         # Convert velocities and accelerations to real world time
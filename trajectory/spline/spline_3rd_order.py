@@ -1,5 +1,6 @@
 from trajectory.spline.spline import Spline
 import tensorflow as tf
+import tensorflow.contrib.eager as tfe
 import numpy as np
 
 
@@ -57,15 +58,19 @@ class Spline3rdOrder(Spline):
             tg_n1 = goal_config.heading_nk1()[:, :, 0]
             vg_n1 = goal_config.speed_nk1()[:, :, 0]
 
+            # Goal headings are used by both a and b coefficients
+            f2_cos_tg_n1 = f2_n1*tf.cos(tg_n1)
+            f2_sin_tg_n1 = f2_n1*tf.sin(tg_n1)
+
             d1_n1 = x0_n1
             c1_n1 = f1_n1*tf.cos(t0_n1)
-            a1_n1 = f2_n1*tf.cos(tg_n1)-2*xg_n1+c1_n1+2*d1_n1
-            b1_n1 = 3*xg_n1-f2_n1*tf.cos(tg_n1)-2*c1_n1-3*d1_n1
+            a1_n1 = f2_cos_tg_n1-2*xg_n1+c1_n1+2*d1_n1
+            b1_n1 = 3*xg_n1-f2_cos_tg_n1-2*c1_n1-3*d1_n1
 
             d2_n1 = y0_n1
             c2_n1 = f1_n1*tf.sin(t0_n1)
-            a2_n1 = f2_n1*tf.sin(tg_n1)-2*yg_n1+c2_n1+2*d2_n1
-            b2_n1 = 3*yg_n1-f2_n1*tf.sin(tg_n1)-2*c2_n1-3*d2_n1
+            a2_n1 = f2_sin_tg_n1-2*yg_n1+c2_n1+2*d2_n1
+            b2_n1 = 3*yg_n1-f2_sin_tg_n1-2*c2_n1-3*d2_n1
 
             c3_n1 = (final_times_n1 * v0_n1) / f1_n1
             a3_n1 = (final_times_n1*vg_n1/f2_n1) + c3_n1 - 2.
@@ -85,54 +90,58 @@ class Spline3rdOrder(Spline):
         """ Evaluates the spline on points in ts_nk
         Assumes ts is normalized to be in [0, 1.]
         """
-        x_coeffs_n14 = self.x_coeffs_n14
-        y_coeffs_n14 = self.y_coeffs_n14
-        p_coeffs_n14 = self.p_coeffs_n14
-
         with tf.name_scope('eval_spline'):
-            ts_n4k = tf.stack([tf.pow(ts_nk, 3), tf.pow(ts_nk, 2),
-                               ts_nk, tf.ones_like(ts_nk)], axis=1)
-            ps_nk = tf.squeeze(tf.matmul(p_coeffs_n14, ts_n4k), axis=1)
+            spline_nk = self._eval_spline_fused(self.x_coeffs_n14, self.y_coeffs_n14, self.p_coeffs_n14,
+                                                ts_nk, calculate_speeds)
+            if calculate_speeds:
+                self._position_nk2, self._heading_nk1, self._speed_nk1, self._angular_speed_nk1 = spline_nk
+                self._acceleration_nk1 = tf.zeros_like(self._speed_nk1)
+                self._angular_acceleration_nk1 = tf.zeros_like(self._speed_nk1)
+            else:
+                self._position_nk2, self._heading_nk1 = spline_nk
 
-            ps_n4k = tf.stack([tf.pow(ps_nk, 3), tf.pow(ps_nk, 2),
-                               ps_nk, tf.ones_like(ps_nk)], axis=1)
-            ps_dot_n4k = tf.stack([3.0*tf.pow(ps_nk, 2), 2.0*ps_nk,
-                                   tf.ones_like(ps_nk), tf.zeros_like(ps_nk)],
-                                  axis=1)
+    # Compiled with XLA and traced once per input shape and calculate_speeds value
+    @staticmethod
+    @tfe.defun(compiled=True)
+    def _eval_spline_fused(x_coeffs_n14, y_coeffs_n14, p_coeffs_n14, ts_nk, calculate_speeds):
+        """ Returns the position and heading (and speed and angular speed if
+        calculate_speeds is True) of the spline evaluated at ts_nk."""
+        a1_n1, b1_n1, c1_n1, d1_n1 = [x_coeffs_n14[:, :, i] for i in range(4)]
+        a2_n1, b2_n1, c2_n1, d2_n1 = [y_coeffs_n14[:, :, i] for i in range(4)]
+        a3_n1, b3_n1, c3_n1 = [p_coeffs_n14[:, :, i] for i in range(3)]
 
-            xs_nk = tf.squeeze(tf.matmul(x_coeffs_n14, ps_n4k), axis=1)
-            ys_nk = tf.squeeze(tf.matmul(y_coeffs_n14, ps_n4k), axis=1)
+        # Polynomials are evaluated with Horner's rule (d3 is always 0)
+        ps_nk = ((a3_n1*ts_nk + b3_n1)*ts_nk + c3_n1)*ts_nk
 
-            xs_dot_nk = tf.squeeze(tf.matmul(x_coeffs_n14, ps_dot_n4k), axis=1)
-            ys_dot_nk = tf.squeeze(tf.matmul(y_coeffs_n14, ps_dot_n4k), axis=1)
+        xs_nk = ((a1_n1*ps_nk + b1_n1)*ps_nk + c1_n1)*ps_nk + d1_n1
+        ys_nk = ((a2_n1*ps_nk + b2_n1)*ps_nk + c2_n1)*ps_nk + d2_n1
 
-            self._position_nk2 = tf.stack([xs_nk, ys_nk], axis=2)
-            self._heading_nk1 = tf.atan2(ys_dot_nk, xs_dot_nk)[:, :, None]
+        xs_dot_nk = (3.0*a1_n1*ps_nk + 2.0*b1_n1)*ps_nk + c1_n1
+        ys_dot_nk = (3.0*a2_n1*ps_nk + 2.0*b2_n1)*ps_nk + c2_n1
 
-            if calculate_speeds:
-                ts_dot_n4k = tf.stack([3.0*tf.pow(ts_nk, 2), 2.0*ts_nk,
-                                       tf.ones_like(ts_nk), tf.zeros_like(ts_nk)],
-                                      axis=1)
-                ps_ddot_n4k = tf.stack([6.0*ps_nk, 2.0*tf.ones_like(ps_nk),
-                                        tf.zeros_like(ps_nk),
-                                        tf.zeros_like(ps_nk)], axis=1)
+        position_nk2 = tf.stack([xs_nk, ys_nk], axis=2)
+        heading_nk1 = tf.atan2(ys_dot_nk, xs_dot_nk)[:, :, None]
 
-                ps_dot_nk = tf.squeeze(tf.matmul(p_coeffs_n14, ts_dot_n4k), axis=1)
+        if not calculate_speeds:
+            return position_nk2, heading_nk1
 
-                xs_ddot_nk = tf.squeeze(tf.matmul(x_coeffs_n14, ps_ddot_n4k), axis=1)
-                ys_ddot_nk = tf.squeeze(tf.matmul(y_coeffs_n14, ps_ddot_n4k), axis=1)
+        ps_dot_nk = (3.0*a3_n1*ts_nk + 2.0*b3_n1)*ts_nk + c3_n1
 
-                speed_ps_nk = tf.sqrt(xs_dot_nk**2 + ys_dot_nk**2)
-                speed_nk = (speed_ps_nk*ps_dot_nk)
+        xs_ddot_nk = 6.0*a1_n1*ps_nk + 2.0*b1_n1
+        ys_ddot_nk = 6.0*a2_n1*ps_nk + 2.0*b2_n1
 
-                numerator_nk = xs_dot_nk*ys_ddot_nk-ys_dot_nk*xs_ddot_nk
-                angular_speed_nk = numerator_nk/(speed_ps_nk**2) * ps_dot_nk
+        speed_ps_sq_nk = xs_dot_nk*xs_dot_nk + ys_dot_nk*ys_dot_nk
+        speed_nk = tf.sqrt(speed_ps_sq_nk)*ps_dot_nk
 
-                self._speed_nk1 = speed_nk[:, :, None]
-                self._angular_speed_nk1 = angular_speed_nk[:, :, None]
+        # The angular speed is undefined where the spline is stationary
+        # (zero speed) so it is set to 0 there instead of NaN
+        moving_nk = speed_ps_sq_nk > 0.
+        safe_speed_ps_sq_nk = tf.where(moving_nk, speed_ps_sq_nk, tf.ones_like(speed_ps_sq_nk))
+        numerator_nk = xs_dot_nk*ys_ddot_nk-ys_dot_nk*xs_ddot_nk
+        angular_speed_nk = tf.where(moving_nk, numerator_nk/safe_speed_ps_sq_nk * ps_dot_nk,
+                                    tf.zeros_like(numerator_nk))
 
-                self._acceleration_nk1 = tf.zeros_like(self._speed_nk1)
-                self._angular_acceleration_nk1 = tf.zeros_like(self._speed_nk1)
+        return position_nk2, heading_nk1, speed_nk[:, :, None], angular_speed_nk[:, :, None]
 
     def check_dynamic_feasibility(self, speed_max_system, angular_speed_max_system, horizon_s):
         """Checks whether the current computed spline can be executed in time <= horizon_s (specified in seconds)
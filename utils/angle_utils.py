@@ -11,15 +11,13 @@ def rotate_pos_nk2(pos_nk2, theta_n11):
     """ Utility function to rotate positions in pos_nk2
     by angles indicated in theta_n11. Assumes the rotation
     does not vary over time (hence theta_n11 not theta_nk1)."""
-    # Broadcast theta_n11 to size nk1. broadcast_to does not track gradients so addition is used
-    # here instead
-    theta_nk1 = theta_n11 + 0. * pos_nk2[:, :, 0:1]
-    if type(theta_nk1) is np.ndarray:
-        n, k, _ = [x for x in theta_nk1.shape]
-    else:
-        n, k, _ = [x.value for x in theta_nk1.shape]
-    rot_matrix_nk22 = padded_rotation_matrix(theta_n11, shape=(n, k, 2))
-    pos_rot_nk2 = tf.matmul(rot_matrix_nk22, pos_nk2[:, :, :, None])[:, :, :, 0]
+    # The rotation is applied componentwise, broadcasting theta_n11 across
+    # time, rather than building and multiplying by (n, k, 2, 2) rotation matrices
+    cos_theta_n11 = tf.cos(theta_n11)
+    sin_theta_n11 = tf.sin(theta_n11)
+    x_nk1, y_nk1 = pos_nk2[:, :, 0:1], pos_nk2[:, :, 1:2]
+    pos_rot_nk2 = tf.concat([x_nk1*cos_theta_n11 - y_nk1*sin_theta_n11,
+                             x_nk1*sin_theta_n11 + y_nk1*cos_theta_n11], axis=2)
     return pos_rot_nk2
 
 
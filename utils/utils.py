@@ -14,6 +14,10 @@ def tf_session_config():
     # Allows for memory growth so the process only uses the amount of memory it needs
     config.gpu_options.allow_growth = True
 
+    # Turns on XLA auto-clustering so chains of pointwise ops (i.e. the
+    # system dynamics) are fused into a single kernel
+    config.graph_options.optimizer_options.global_jit_level = tf.OptimizerOptions.ON_1
+
     # Allows for tensors to be copied onto cpu when no cuda gpu kernel is available
     device_policy = tf.contrib.eager.DEVICE_PLACEMENT_SILENT
 